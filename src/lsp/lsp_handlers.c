@@ -10,7 +10,7 @@
 
 // Debug logging to file
 #define LSP_LOG(fmt, ...) do { \
-    FILE* f = fopen("/tmp/jsasta_lsp.log", "a"); \
+    FILE* f = fopen(lsp_log_path(), "a"); \
     if (f) { \
         time_t now = time(NULL); \
         char* timestamp = ctime(&now); \
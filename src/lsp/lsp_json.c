@@ -503,13 +503,13 @@ static int json_skip_value_fast(JSONParser* p, char scope_end) {
         // Case 3: Any other value (number, true, false, null, or even garbage).
         // Perform a blind, high-speed scan for a terminator.
         default: {
-          while (p->pos < p->length)  while (p->pos < p->length) {
+          while (p->pos < p->length) {
               unsigned char c = p->input[p->pos];
               if (isspace(c) || c == ',' || c == scope_end)
                   break;
               p->pos++;
           }
-          return 0; // This scan always "succeeds".s "succeeds"
+          return 0; // This scan always "succeeds".
         }
     }
 }
@@ -521,6 +521,8 @@ int json_parse_fast_object(JSONParser* p, JSONParserObjectCallback* callback, vo
 
 
     while(p->pos < p->length) {
+      // Skip to the opening quote first, the key starts right after it.
+      skip_whitespace(p);
 	    const char* key = &p->input[p->pos + 1];
       if (parse_string_string_and_terminate(p)  != 0)
           return 1;
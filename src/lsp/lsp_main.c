@@ -11,6 +11,8 @@ void print_usage(const char* program_name) {
     fprintf(stderr, "\nOptions:\n");
     fprintf(stderr, "  --stdio        Use stdio for communication (default)\n");
     fprintf(stderr, "  -h, --help     Show this help message\n");
+    fprintf(stderr, "\nEnvironment:\n");
+    fprintf(stderr, "  JSASTA_LSP_LOG Debug log file (default: /tmp/jsasta_lsp.log)\n");
     fprintf(stderr, "\nThe LSP server communicates via JSON-RPC over stdin/stdout.\n");
     fprintf(stderr, "It is designed to be used with editors like VSCode, Neovim, Zed, etc.\n");
 }
@@ -53,14 +55,19 @@ int main(int argc, char** argv) {
     }
 
     // Initialize logger - write to file for debugging (stdout is for protocol)
-    FILE* log_file = fopen("/tmp/jsasta_lsp.log", "a");
+    FILE* log_file = fopen(lsp_log_path(), "a");
     if (log_file) {
         fprintf(log_file, "\n=== LSP Server Starting ===\n");
         fflush(log_file);
         fclose(log_file);
     }
     logger_init(LOG_VERBOSE);
-    
+
+    // The main loop polls fd 0 with select() before each read, so stdin must not
+    // be buffered: clients may write several framed messages in one go and any
+    // bytes sitting in a stdio buffer would be invisible to select().
+    setvbuf(stdin, NULL, _IONBF, 0);
+
     // Create and run LSP server
     LSPServer* server = lsp_server_create();
     lsp_server_run(server);
@@ -11,7 +11,7 @@
 
 // Debug logging to file
 #define LSP_LOG(fmt, ...) do { \
-    FILE* f = fopen("/tmp/jsasta_lsp.log", "a"); \
+    FILE* f = fopen(lsp_log_path(), "a"); \
     if (f) { \
         time_t now = time(NULL); \
         char* timestamp = ctime(&now); \
@@ -303,6 +303,11 @@ static int lsp_json_message_parser_callback(JSONParser* p, const char* key, void
  *
  */
 
+const char* lsp_log_path(void) {
+    const char* path = getenv("JSASTA_LSP_LOG");
+    return (path && *path) ? path : "/tmp/jsasta_lsp.log";
+}
+
 // Check if stdin has data available (with timeout)
 // Returns: 1 if data available, 0 if timeout, -1 if error
 int lsp_check_stdin(int timeout_ms) {
@@ -427,7 +432,7 @@ LSPMessage* lsp_read_message(void) {
 
 // Write a message to stdout with Content-Length header
 void lsp_write_message(const char* json_content) {
-    FILE* log = fopen("/tmp/jsasta_lsp.log", "a");
+    FILE* log = fopen(lsp_log_path(), "a");
     if (log) {
         fprintf(log, "[WRITE] About to write %zu bytes to stdout:\n%s\n", strlen(json_content), json_content);
         fflush(log);
@@ -438,7 +443,7 @@ void lsp_write_message(const char* json_content) {
     fprintf(stdout, "Content-Length: %zu\r\n\r\n%s", len, json_content);
     fflush(stdout);
 
-    log = fopen("/tmp/jsasta_lsp.log", "a");
+    log = fopen(lsp_log_path(), "a");
     if (log) {
         fprintf(log, "[WRITE] Wrote and flushed to stdout\n");
         fflush(log);
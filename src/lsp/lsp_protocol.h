@@ -81,6 +81,9 @@ typedef struct {
     bool inlay_hint_provider;
 } LSPServerCapabilities;
 
+// Path of the debug log file: $JSASTA_LSP_LOG, or /tmp/jsasta_lsp.log if unset
+const char* lsp_log_path(void);
+
 // === JSON-RPC Protocol Functions ===
 
 // Check if stdin has data available (with timeout in ms)
@@ -13,7 +13,7 @@
 // Debug logging to file
 #define LSP_LOG(fmt, ...)                                                      \
 	do {                                                                         \
-		FILE *f = fopen("/tmp/jsasta_lsp.log", "a");                               \
+		FILE *f = fopen(lsp_log_path(), "a");                                      \
 		if (f) {                                                                   \
 			time_t now = time(NULL);                                                 \
 			char *timestamp = ctime(&now);                                           \
@@ -221,7 +221,6 @@ static void *diagnostic_worker_thread(void *arg) {
 		    lsp_create_diagnostics_notification(work->uri, diagnostics, count);
 		char *notification = lsp_serialize_notification(
 		    "textDocument/publishDiagnostics", diag_params);
-		lsp_write_message(notification);
 
 		if (count > 0 && diagnostics) {
 			for (int i = 0; i < count; i++) {
@@ -232,17 +231,23 @@ static void *diagnostic_worker_thread(void *arg) {
 			free(diagnostics);
 		}
 		free(diag_params);
-		free(notification);
 
 		// Store completed work for code index rebuild (with type information)
-		// Use atomic_exchange to safely pass the work to main thread
+		// Use atomic_exchange to safely pass the work to main thread.
+		// This must happen before diagnostics are published: clients treat them
+		// as "analysis done" and may immediately ask for definitions, which are
+		// answered from the typed index rebuilt out of completed_work. The main
+		// thread owns (and may free) work from here on, so don't touch it.
 		AnalysisWork *old_work = atomic_exchange(&work_doc->completed_work, work);
 		if (old_work) {
 			// Free any previous completed work that wasn't consumed yet
+			LSP_LOG("Replaced unconsume completed work for %s", old_work->uri);
 			analysis_work_free(old_work);
-			LSP_LOG("Replaced unconsume completed work for %s", work->uri);
 		}
 
+		lsp_write_message(notification);
+		free(notification);
+
 		LSP_LOG("Worker finished processing, stored completed work for code index "
 		        "rebuild");
 	}
@@ -0,0 +1,355 @@
+"""Minimal LSP client used by the jsastad integration tests.
+
+Messages are framed as bytes and written with writev(2) on the server's stdin;
+a reader thread collects responses and published diagnostics from stdout.
+"""
+
+import itertools
+import json
+import os
+import selectors
+import signal
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+try:
+    from orjson import dumps as json_dumps, loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+    def json_dumps(obj):
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def frame(method, params=None, id=None):
+    """Encode a JSON-RPC message as a (header, content) pair of byte strings."""
+    msg = {"jsonrpc": "2.0", "method": method}
+    if id is not None:
+        msg["id"] = id
+    if params is not None:
+        msg["params"] = params
+
+    content = json_dumps(msg)
+    return b"Content-Length: %d\r\n\r\n" % len(content), content
+
+
+# The session boilerplate never changes, so it is framed once at import.
+# initialize and shutdown get reserved ids; next_id() starts after them.
+INIT_ID = 1
+SHUTDOWN_ID = 2
+INIT_FRAME = frame(
+    "initialize", {"capabilities": {}, "rootUri": "file:///tmp"}, INIT_ID
+)
+INITIALIZED_FRAME = frame("initialized", {})
+SHUTDOWN_FRAME = frame("shutdown", id=SHUTDOWN_ID)
+EXIT_FRAME = frame("exit", {})
+
+
+@dataclass
+class ChangeEvent:
+    """A ranged (incremental) content change for textDocument/didChange."""
+
+    line_start: int
+    char_start: int
+    line_end: int
+    char_end: int
+    text: str
+
+
+_did_change_buf = bytearray()
+
+
+def serialize_did_change(uri_bytes, version, changes):
+    """Frame a didChange notification without building the params dicts.
+
+    `uri_bytes` is inserted verbatim, so it must not need JSON escaping. The
+    body is assembled in a bytearray reused across calls; only the finished
+    frame is copied out.
+    """
+    buf = _did_change_buf
+    buf.clear()
+    buf += b'{"jsonrpc":"2.0","method":"textDocument/didChange","params":'
+    buf += b'{"textDocument":{"uri":"%s","version":%d},"contentChanges":[' % (
+        uri_bytes,
+        version,
+    )
+    for i, change in enumerate(changes):
+        if i:
+            buf += b","
+        buf += b'{"range":{"start":{"line":%d,"character":%d},' % (
+            change.line_start,
+            change.char_start,
+        )
+        buf += b'"end":{"line":%d,"character":%d}},"text":' % (
+            change.line_end,
+            change.char_end,
+        )
+        buf += json_dumps(change.text)
+        buf += b"}"
+    buf += b"]}}"
+    return b"Content-Length: %d\r\n\r\n" % len(buf), bytes(buf)
+
+
+def send_raw(fd, buffers):
+    """Write all `buffers` to `fd`, gathered into as few writev(2) calls as possible."""
+    written = os.writev(fd, buffers)
+    total = sum(len(b) for b in buffers)
+    if written < total:
+        # Short write (e.g. a large document filling the pipe): finish it plainly.
+        rest = memoryview(b"".join(buffers))[written:]
+        while rest:
+            rest = rest[os.write(fd, rest):]
+
+
+class FrameReader:
+    """Split Content-Length framed messages out of a raw file descriptor.
+
+    Reads in large chunks and finds header ends with bytes.find, rather than
+    making a readline() call per header line of every message.
+    """
+
+    def __init__(self, fd, chunk_size=65536):
+        self.fd = fd
+        self.chunk_size = chunk_size
+        self._buf = bytearray()
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(fd, selectors.EVENT_READ)
+
+    def _fill(self, deadline=None):
+        """Read what is available; False at EOF, TimeoutError past `deadline`."""
+        if deadline is not None:
+            while not self._selector.select(deadline - time.monotonic()):
+                if time.monotonic() >= deadline:
+                    raise TimeoutError
+        chunk = os.read(self.fd, self.chunk_size)
+        self._buf += chunk
+        return bool(chunk)
+
+    def read_frame(self, timeout=None):
+        """Return the next message body, or None at EOF.
+
+        With a timeout, raises TimeoutError if no complete message arrived in
+        time; bytes read so far are kept for the next call.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        buf = self._buf
+        while True:
+            end = buf.find(b"\r\n\r\n")
+            if end != -1:
+                break
+            if not self._fill(deadline):
+                return None
+
+        length = 0
+        for line in buf[:end].split(b"\r\n"):
+            if line[:15].lower() == b"content-length:":
+                length = int(line[15:])
+
+        # The header stays buffered until the whole body is in, so a timeout
+        # never loses a partially received message.
+        start = end + 4
+        while len(buf) < start + length:
+            if not self._fill(deadline):
+                return None
+        body = bytes(buf[start : start + length])
+        del buf[: start + length]
+        return body
+
+    def close(self):
+        self._selector.close()
+
+
+class LspClient:
+    """Talks to a running LSP server; threads collect what it sends back."""
+
+    def __init__(self, proc):
+        self.proc = proc
+        self.fd = self.proc.stdin.fileno()
+        os.set_blocking(self.fd, True)
+        self._pending = []
+        self.responses = {}
+        self.diagnostics = {}
+        self.stderr_lines = []
+        self.eof = threading.Event()
+        self._closing = threading.Event()
+        self._ids = itertools.count(SHUTDOWN_ID + 1)
+        self._cond = threading.Condition()
+        # Both pipes are drained from the start: jsastad logs every message it
+        # handles to stderr, and a full pipe would block it in write(2).
+        self._threads = [
+            threading.Thread(target=self._reader, daemon=True),
+            threading.Thread(target=self._drain_stderr, daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _reader(self):
+        frames = FrameReader(self.proc.stdout.fileno())
+        try:
+            while not self._closing.is_set():
+                try:
+                    body = frames.read_frame(timeout=0.1)
+                except TimeoutError:
+                    continue
+                if body is None:
+                    self.eof.set()
+                    return
+
+                msg = json_loads(body)
+                with self._cond:
+                    if "method" not in msg:
+                        self.responses[msg["id"]] = msg
+                    elif msg["method"] == "textDocument/publishDiagnostics":
+                        uri = msg["params"]["uri"]
+                        self.diagnostics.setdefault(uri, []).append(msg["params"])
+                    self._cond.notify_all()
+        finally:
+            frames.close()
+
+    def _drain_stderr(self):
+        for line in self.proc.stderr:
+            self.stderr_lines.append(line)
+
+    def next_id(self):
+        return next(self._ids)
+
+    def send(self, method, params=None, id=None, flush=True):
+        """Queue a message for the server, flushing the queue unless told not to."""
+        self.send_frame(frame(method, params, id), flush)
+
+    def send_frame(self, framed, flush=True):
+        self._pending.extend(framed)
+        if flush:
+            self.flush()
+
+    def send_batch(self, msgs):
+        """Send several (method, params, id) messages with a single writev."""
+        for method, params, id in msgs:
+            self.send(method, params, id, flush=False)
+        self.flush()
+
+    def flush(self):
+        # Bypass proc.stdin's BufferedWriter and hand the kernel all queued
+        # headers and bodies at once.
+        if self._pending:
+            buffers, self._pending = self._pending, []
+            send_raw(self.fd, buffers)
+
+    def wait_response(self, id, timeout=5):
+        """Return the response to request `id`, or None on timeout."""
+        with self._cond:
+            self._cond.wait_for(lambda: id in self.responses, timeout)
+            return self.responses.get(id)
+
+    def wait_diagnostics(self, uri, count=1, timeout=5):
+        """Wait until diagnostics for `uri` were published `count` times.
+
+        The server publishes them once type inference for the document is
+        done and its typed index is in place, so this is the signal that a
+        didOpen/didChange was analyzed and requests will see the result.
+        """
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: len(self.diagnostics.get(uri, ())) >= count, timeout
+            )
+
+    def request(self, method, params, timeout=5):
+        """Send a request with a fresh id and return its response."""
+        id = self.next_id()
+        self.send(method, params, id=id)
+        return self.wait_response(id, timeout)
+
+    def open_document(self, uri, text, version=1):
+        self.send(
+            "textDocument/didOpen",
+            {
+                "textDocument": {
+                    "uri": uri,
+                    "languageId": "jsasta",
+                    "version": version,
+                    "text": text,
+                }
+            },
+        )
+
+    def send_init(self):
+        """Send the initialize request and initialized notification in one write."""
+        self.send_frame(INIT_FRAME, flush=False)
+        self.send_frame(INITIALIZED_FRAME)
+
+    def initialize(self):
+        self.send_init()
+        return self.wait_response(INIT_ID)
+
+    def shutdown(self, timeout=0.1):
+        """Ask the server to exit: shutdown, then exit once it is acknowledged.
+
+        Gives up after `timeout` seconds overall; a server that does not
+        acknowledge shutdown is not sent exit.
+        """
+        deadline = time.monotonic() + timeout
+        try:
+            self.send_frame(SHUTDOWN_FRAME)
+            if self.wait_response(SHUTDOWN_ID, timeout) is None:
+                return
+            self.send_frame(EXIT_FRAME)
+            # The server closes stdout once it has handled exit.
+            self.eof.wait(max(deadline - time.monotonic(), 0))
+        except BrokenPipeError:
+            pass
+
+    def join(self, timeout=1):
+        """Stop the pipe reader threads."""
+        self._closing.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+
+@contextmanager
+def lsp_server(server_path, cwd=None, env=None):
+    """Run an LSP server and yield an LspClient connected to it.
+
+    `server_path` should be absolute; it is executed directly, without a PATH
+    lookup. On exit the server, unless it already exited, gets ~100ms to shut
+    down through the protocol; then its stdin is closed and it gets another
+    ~100ms to go away before its process group is killed, so a hung server
+    cannot stall teardown.
+    """
+    # Binary pipes; stdin is written through its raw fd (see LspClient.flush).
+    # The server runs in its own session so the kill also reaches any children.
+    proc = subprocess.Popen(
+        [server_path],
+        executable=server_path,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        cwd=cwd,
+        env=env,
+        bufsize=-1,
+        close_fds=True,
+        start_new_session=True,
+    )
+    client = LspClient(proc)
+    try:
+        yield client
+    finally:
+        if proc.poll() is None:
+            client.shutdown()
+        try:
+            proc.stdin.close()
+        except BrokenPipeError:
+            pass
+        for _ in range(10):
+            if proc.poll() is not None:
+                break
+            time.sleep(0.01)
+        else:
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        proc.wait()
+        client.join()
@@ -0,0 +1,40 @@
+"""Shared jsastad session for the LSP integration tests.
+
+The server is spawned and initialized once per test session (per worker when
+running under pytest-xdist). Each test opens its own document uri and waits on
+the server's responses and diagnostics.
+"""
+
+import os
+
+import pytest
+
+from _lsp_client import lsp_server
+
+PROJECT_ROOT = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+# `make` links the server into build/release; JSASTA_LSPD points the tests at
+# another one, e.g. build/debug/jsastad from `make DEBUG=1`.
+LSP_BIN = os.path.abspath(
+    os.environ.get("JSASTA_LSPD")
+    or os.path.join(PROJECT_ROOT, "build", "release", "jsastad")
+)
+
+
+@pytest.fixture(scope="session")
+def lsp(tmp_path_factory):
+    if not os.access(LSP_BIN, os.X_OK):
+        pytest.fail(
+            f"LSP server not found at {LSP_BIN}: build it first with make, "
+            "or set JSASTA_LSPD"
+        )
+
+    # A log of its own per server, so parallel runs never share or race on it.
+    # It lives in pytest's temp dir, which pytest prunes to the last few runs.
+    log_path = tmp_path_factory.mktemp("jsastad") / "jsasta_lsp.log"
+    env = {**os.environ, "JSASTA_LSP_LOG": str(log_path)}
+
+    with lsp_server(LSP_BIN, cwd=PROJECT_ROOT, env=env) as client:
+        assert client.initialize() is not None, "no initialize response"
+        yield client